@@ -1,101 +1,109 @@
 """
 normalize_house_number(num):
-    Normalizes house numbers by removing non-numeric characters and converting to string.
+    Normalizes house numbers by removing spaces and leading zeros and converting to string.
         num (str or int or float): The house number to normalize.
         str: The normalized house number as a string.
 This module provides utilities for parsing and standardizing addresses, as well as splitting full names.
 Attributes:
-    street_type_mapping (dict): A dictionary mapping various street type names to their standardized abbreviations.
+    street_type_mapping (dict): A dictionary mapping street type names and abbreviations, without trailing periods, to their standardized abbreviations.
     matchable_columns (list): A list of columns that are applicable across both standardized and cleaned up addresses from Amazon and Shopify.
 Functions:
     parse_us_address(address):
-        Parses a US address using the usaddress library.
+        Parses a US address using the usaddress library. Results are cached per address string.
         Args:
             address (str): The address to parse.
         Returns:
             dict: A dictionary containing the parsed address components.
     parse_international_address(address):
-        Parses an international address using the pyap library.
+        Parses an international address using the pyap library. Results are cached per address string.
         Args:
             address (str): The address to parse.
         Returns:
             dict: A dictionary containing the parsed address components, or an empty dictionary if parsing fails.
-    standardize_address_shopify(row):
-        Standardizes a Shopify address, converting street types to their standardized abbreviations and converting all text to uppercase.
+    standardize_addresses(df, full_address_col='full_address', normalize_num=False, missing_street_type=None):
+        Standardizes addresses column-wise, converting street types to their standardized abbreviations and converting all text to uppercase.
         Args:
-            row (pd.Series): A pandas Series containing the address components.
+            df (pd.DataFrame): A pandas DataFrame containing the address components, one address per row.
+            full_address_col (str): The column holding the address line(s) to parse. Defaults to 'full_address'.
+            normalize_num (bool): Whether to normalize house numbers with normalize_house_numbers. Defaults to False.
+            missing_street_type (str, optional): Value to use for US street types the parser did not find. Defaults to None.
         Returns:
-            pd.Series: A pandas Series containing the standardized address components.
-    standardize_address_amazon(row):
-        Standardizes an Amazon address, converting street types to their standardized abbreviations and converting all text to uppercase.
+            pd.DataFrame: A pandas DataFrame containing the standardized address components, aligned to df's index.
+    normalize_house_numbers(nums):
+        Normalizes a Series of house numbers column-wise, following the same rules as normalize_house_number.
         Args:
-            row (pd.Series): A pandas Series containing the address components.
+            nums (pd.Series): The house numbers to normalize.
         Returns:
-            pd.Series: A pandas Series containing the standardized address components.
+            pd.Series: The normalized house numbers as strings.
+    standardize_canadian_zips(zips):
+        Removes non-alphanumeric characters from a Series of Canadian postal codes.
+        Args:
+            zips (pd.Series): The postal codes to standardize.
+        Returns:
+            pd.Series: The 6 character postal codes, or NaN where a code is invalid.
     split_full_name(full_name):
         Splits a full name into first, middle, and last names, removing any punctuation.
         Args:
             full_name (str): The full name to split.
         Returns:
             pd.Series: A pandas Series containing the first, middle, and last names.
+    split_full_name_series(full_names):
+        Splits a Series of full names into first, middle, and last names column-wise, removing any punctuation.
+        Args:
+            full_names (pd.Series): The full names to split.
+        Returns:
+            pd.DataFrame: A pandas DataFrame with first_name, middle_name, and last_name columns.
 """
+import numpy as np
 import pandas as pd
 import usaddress
 import pyap
+import os
+import re
 import string
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from tqdm import tqdm
 
-# Mapping for standardizing street types
+# Mapping for standardizing street types; trailing periods are stripped before lookup
 street_type_mapping = {
     'STREET': 'ST',
     'ST': 'ST',
-    'ST.': 'ST',
     'AVENUE': 'AVE',
     'AVE': 'AVE',
-    'AVE.': 'AVE',
     'BOULEVARD': 'BLVD',
     'BLVD': 'BLVD',
-    'BLVD.': 'BLVD',
     'ROAD': 'RD',
     'RD': 'RD',
-    'RD.': 'RD',
     'DRIVE': 'DR',
     'DR': 'DR',
-    'DR.': 'DR',
     'COURT': 'CT',
     'CT': 'CT',
-    'CT.': 'CT',
     'LANE': 'LN',
     'LN': 'LN',
-    'LN.': 'LN',
     'TERRACE': 'TER',
     'TER': 'TER',
-    'TER.': 'TER',
     'PLACE': 'PL',
     'PL': 'PL',
-    'PL.': 'PL',
     'SQUARE': 'SQ',
     'SQ': 'SQ',
-    'SQ.': 'SQ',
     'TRAIL': 'TRL',
     'TRL': 'TRL',
-    'TRL.': 'TRL',
     'PARKWAY': 'PKWY',
     'PKWY': 'PKWY',
-    'PKWY.': 'PKWY',
     'COMMONS': 'CMNS',
     'CMNS': 'CMNS',
-    'CMNS.': 'CMNS',
     'HIGHWAY': 'HWY',
     'HWY': 'HWY',
-    'HWY.': 'HWY',
     'CIRCLE': 'CIR',
     'CIR': 'CIR',
-    'CIR.': 'CIR',
     'EXPRESSWAY': 'EXPY',
-    'EXPY': 'EXPY',
-    'EXPY.': 'EXPY'
+    'EXPY': 'EXPY'
 }
 
+# Below this many unique addresses, parsing serially beats paying for process startup
+parallel_parse_threshold = 5000
+
 matchable_columns = [
     'first_name',
     'middle_name',
@@ -116,8 +124,38 @@ matchable_columns = [
     'unit_number'
 ]
 
+# Regex fast path for the common "number name type [unit]" street line, so only unusual addresses pay for usaddress's CRF.
+# Highways, directionals and words usaddress tags contextually (PO BOX, COUNTY, EL CAMINO...) are left to usaddress.
+_fast_path_street_types = sorted(
+    set(street_type_mapping) - {'HIGHWAY', 'HWY'},
+    key=len, reverse=True
+)
+_fast_path_pattern = re.compile(
+    r'^(?P<AddressNumber>\d+)\s+(?P<StreetName>[A-Z]+(?:\s+[A-Z]+)*?)\s+(?P<StreetNamePostType>' + '|'.join(map(re.escape, _fast_path_street_types)) + r')'
+    r'(?:\s+(?P<OccupancyType>APT|STE|UNIT)\s+(?P<OccupancyIdentifier>[A-Z0-9]+))?$',
+    re.IGNORECASE
+)
+_fast_path_excluded_words = set(street_type_mapping) | {
+    'N', 'S', 'E', 'W', 'NE', 'NW', 'SE', 'SW', 'NORTH', 'SOUTH', 'EAST', 'WEST',
+    'NORTHEAST', 'NORTHWEST', 'SOUTHEAST', 'SOUTHWEST', 'APT', 'STE', 'UNIT',
+    'PO', 'BOX', 'COUNTY', 'ROUTE', 'RTE', 'EL', 'LA', 'THE', 'RUE', 'CAMINO', 'CENTER', 'CENTRE'
+}
+
+def _fast_parse_us_address(address):
+    """Parse a simple US street line with a regex, returning None when usaddress is needed"""
+    match = _fast_path_pattern.match(address)
+    if match is None:
+        return None
+    if any(len(word) == 1 or word.upper() in _fast_path_excluded_words for word in match.group('StreetName').split()):
+        return None
+    return {label: value for label, value in match.groupdict().items() if value is not None}
+
 # Function to parse US addresses
+@lru_cache(maxsize=200_000)
 def parse_us_address(address):
+    parsed = _fast_parse_us_address(address)
+    if parsed is not None:
+        return parsed
     try:
         parsed = usaddress.tag(address)[0]
     except usaddress.RepeatedLabelError as e:
@@ -125,6 +163,7 @@ def parse_us_address(address):
     return parsed
 
 # Function to parse International addresses
+@lru_cache(maxsize=200_000)
 def parse_international_address(address):
     parsed_addresses = pyap.parse(address, country='GB')  # Adjust country as needed
     if parsed_addresses:
@@ -132,179 +171,102 @@ def parse_international_address(address):
     else:
         return {}
 
-# ✅ Function to standardize addresses, street types, and convert to ALL CAPS
-def standardize_address_shopify(row):
+def _parse_address(address, is_us):
+    """Parse a single address, returning the parsed components and whether parsing failed"""
     try:
-        if row['country_code'].upper() == 'US':
-            parsed = parse_us_address(row['full_address'])
-            
-            # Standardize street type using mapping
-            street_type = parsed.get('StreetNamePostType', '').upper().strip()
-            standardized_street_type = street_type_mapping.get(street_type, street_type)
-
-            return pd.Series({
-                'address_number': normalize_house_number(parsed.get('AddressNumber', '').strip()),
-                'street_name': parsed.get('StreetName', '').upper().strip() if parsed.get('StreetName') else None,
-                'street_type': standardized_street_type,
-                'unit_type': parsed.get('OccupancyType', '').upper().strip() if parsed.get('OccupancyType') else None,
-                'unit_number': parsed.get('OccupancyIdentifier', '').upper().strip() if parsed.get('OccupancyIdentifier') else None,
-                'city': parsed.get('PlaceName', row['city']).upper().strip() if parsed.get('PlaceName') else row['city'].upper().strip(),
-                'state': parsed.get('StateName', row['state']).upper().strip() if parsed.get('StateName') else row['state'].upper().strip(),
-                'state_code': parsed.get('StateName', row['state_code']).upper().strip() if parsed.get('StateName') else row['state_code'].upper().strip(),
-                'country': row['country'].upper().strip(),
-                'country_code': row['country_code'].upper().strip(),
-                'zip': parsed.get('ZipCode', row['zip']).upper().strip() if parsed.get('ZipCode') else row['zip'].upper().strip(),
-                'zip_cleaned': row['zip_cleaned'].upper().strip() if row['zip_cleaned'] else None
-            })
-        else:
-            parsed = parse_international_address(row['full_address'])
-            return pd.Series({
-                'address_number': normalize_house_number(parsed.get('AddressNumber', '').strip()),
-                'street_name': parsed.get('street_name', '').upper().strip() if parsed.get('street_name') else None,
-                'street_type': None,  # Adjust if needed for international addresses
-                'unit_type': None,
-                'unit_number': None,
-                'city': parsed.get('city', row['city']).upper().strip() if parsed.get('city') else row['city'].upper().strip(),
-                'state': None,
-                'state_code': None,
-                'country': row['country'].upper().strip(),
-                'country_code': row['country_code'].upper().strip(),
-                'zip': parsed.get('postal_code', row['zip']).upper().strip() if parsed.get('postal_code') else row['zip'].upper().strip(),
-                'zip_cleaned': row['zip_cleaned'].upper().strip() if row['zip_cleaned'] else None
-            })
+        return (parse_us_address(address) if is_us else parse_international_address(address)), False
     except Exception as e:
-        return pd.Series({
-            'address_number': None,
-            'street_name': None,
-            'street_type': None,
-            'unit_type': None,
-            'unit_number': None,
-            'city': None,
-            'state': None,
-            'state_code': None,
-            'country': None,
-            'country_code': None,
-            'zip': None,
-            'zip_cleaned': None
-        })
+        return {}, True
 
-def standardize_address_amazon(row):
-    try:
-        if row['country_code'].upper() == 'US':
-            parsed = parse_us_address(row['address'])
-            
-            # Standardize street type using mapping
-            street_type = parsed.get('StreetNamePostType', '').upper()
-            standardized_street_type = street_type_mapping.get(street_type, street_type)
+# Parser components read by the standardizers, from usaddress and pyap respectively
+_parsed_keys = (
+    'AddressNumber', 'StreetName', 'StreetNamePostType', 'OccupancyType', 'OccupancyIdentifier',
+    'PlaceName', 'StateName', 'ZipCode', 'street_number', 'street_name', 'city', 'postal_code'
+)
 
-            return pd.Series({
-                'address_number': parsed.get('AddressNumber', '').upper().strip() if parsed.get('AddressNumber') else None,
-                'street_name': parsed.get('StreetName', '').upper().strip() if parsed.get('StreetName') else None,
-                'street_type': standardized_street_type.strip() if standardized_street_type else None,
-                'unit_type': parsed.get('OccupancyType', '').upper().strip() if parsed.get('OccupancyType') else None,
-                'unit_number': parsed.get('OccupancyIdentifier', '').upper().strip() if parsed.get('OccupancyIdentifier') else None,
-                'city': parsed.get('PlaceName', row['city']).upper().strip() if parsed.get('PlaceName') else row['city'].upper().strip(),
-                'state': parsed.get('StateName', row['state']).upper().strip() if parsed.get('StateName') else row['state'].upper().strip(),
-                'state_code': parsed.get('StateName', row['state_code']).upper().strip() if parsed.get('StateName') else row['state_code'].upper().strip(),
-                'country': row['country'].upper().strip(),
-                'country_code': row['country_code'].upper().strip(),
-                'zip': parsed.get('ZipCode', row['zip']).upper().strip() if parsed.get('ZipCode') else row['zip'].upper().strip(),
-                'zip_cleaned': row['zip_cleaned'].upper().strip() if row['zip_cleaned'] else None
-            })
-        else:
-            parsed = parse_international_address(row['address'])
-            return pd.Series({
-                'address_number': parsed.get('street_number', '').upper().strip() if parsed.get('street_number') else None,
-                'street_name': parsed.get('street_name', '').upper().strip() if parsed.get('street_name') else None,
-                'street_type': None,  # Adjust if needed for international addresses
-                'unit_type': None,
-                'unit_number': None,
-                'city': parsed.get('city', row['city']).upper().strip() if parsed.get('city') else row['city'].upper().strip(),
-                'state': None,
-                'state_code': None,
-                'country': row['country'].upper().strip(),
-                'country_code': row['country_code'].upper().strip(),
-                'zip': parsed.get('postal_code', row['zip']).upper().strip() if parsed.get('postal_code') else row['zip'].upper().strip(),
-                'zip_cleaned': row['zip_cleaned'].upper().strip() if row['zip_cleaned'] else None
-            })
-    except Exception as e:
-        return pd.Series({
-            'address_number': None,
-            'street_name': None,
-            'street_type': None,
-            'unit_type': None,
-            'unit_number': None,
-            'city': None,
-            'state': None,
-            'state_code': None,
-            'country': None,
-            'country_code': None,
-            'zip': None,
-            'zip_cleaned': None
-        })
+def _parse_rows(addresses, is_us):
+    """Parse each unique address once, returning a DataFrame of raw parser outputs and a mask of rows that failed to parse"""
+    # Repeat customers share addresses, so only parse each (address, is_us) pair once and join back by position
+    keys = pd.DataFrame({'address': addresses.to_numpy(), 'is_us': is_us.to_numpy()})
+    unique_addresses = keys.drop_duplicates(ignore_index=True)
+    codes = keys.merge(unique_addresses.reset_index(), on=['address', 'is_us'], how='left')['index'].to_numpy()
 
-def standardize_address_netsuite(row):
-    try:
-        # Combine address_1 and address_2, with a comma for better parsing
-        full_address = f"{row['address_1']}, {row['address_2']}".strip(', ')
+    # usaddress and pyap are pure Python and hold the GIL, so spread large batches across processes
+    if len(unique_addresses) < parallel_parse_threshold:
+        results = [
+            _parse_address(address, us)
+            for address, us in tqdm(unique_addresses.itertuples(index=False, name=None), total=len(unique_addresses))
+        ]
+    else:
+        # A thread pool runs no faster than the serial loop because the parsers hold the GIL, so keep processes
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            results = list(tqdm(
+                executor.map(_parse_address, unique_addresses['address'], unique_addresses['is_us'], chunksize=1024),
+                total=len(unique_addresses)
+            ))
 
-        if row['country_code'].upper() == 'US':
-            parsed = parse_us_address(full_address)
+    # Scatter the parser dicts into one preallocated list per component and build the DataFrame once
+    columns = {key: [None] * len(results) for key in _parsed_keys}
+    failed = np.zeros(len(results), dtype=bool)
+    for i, (record, failure) in enumerate(results):
+        failed[i] = failure
+        for key, value in record.items():
+            if key in columns:
+                columns[key][i] = value
+    parsed = pd.DataFrame(columns, dtype=object).take(codes)
+    parsed.index = addresses.index
+    return parsed, pd.Series(failed[codes], index=addresses.index)
 
-            street_type = parsed.get('StreetNamePostType', '').upper()
-            standardized_street_type = street_type_mapping.get(street_type, street_type)
+def _parsed_column(parsed, key):
+    """Return a parsed component with empty or missing components as NaN"""
+    if key not in parsed:
+        return pd.Series(np.nan, index=parsed.index, dtype=object)
+    values = parsed[key]
+    return values.where(values.notna() & (values != ''))
 
-            return pd.Series({
-                'address_number': parsed.get('AddressNumber', '').upper().strip() if parsed.get('AddressNumber') else None,
-                'street_name': parsed.get('StreetName', '').upper().strip() if parsed.get('StreetName') else None,
-                'street_type': standardized_street_type.strip() if standardized_street_type else None,
-                'unit_type': parsed.get('OccupancyType', '').upper().strip() if parsed.get('OccupancyType') else None,
-                'unit_number': parsed.get('OccupancyIdentifier', '').upper().strip() if parsed.get('OccupancyIdentifier') else None,
-                'city': parsed.get('PlaceName', row['city']).upper().strip() if parsed.get('PlaceName') else row['city'].upper().strip(),
-                'state': parsed.get('StateName', row['state']).upper().strip() if parsed.get('StateName') else row['state'].upper().strip(),
-                'state_code': parsed.get('StateName', row['state']).upper().strip() if parsed.get('StateName') else row['state'].upper().strip(),
-                'country': row['country_code'].upper().strip(),
-                'country_code': row['country_code'].upper().strip(),
-                'zip': parsed.get('ZipCode', row['zip']).upper().strip() if parsed.get('ZipCode') else row['zip'].upper().strip(),
-                'zip_cleaned': row['zip_cleaned'].upper().strip() if row['zip_cleaned'] else None
-            })
+def _finalize(standardized, failed):
+    """Upper-case and strip every column in one pass, blank out rows that failed to parse and use None for missing values"""
+    standardized = standardized.apply(lambda column: column.str.upper().str.strip()).astype(object)
+    standardized = standardized.where(standardized.notna(), None)
+    standardized.loc[failed] = None
+    return standardized
 
-        else:
-            # Handle international addresses
-            parsed = parse_international_address(full_address)
+# ✅ Function to standardize addresses, street types, and convert to ALL CAPS
+def standardize_addresses(df, full_address_col='full_address', normalize_num=False, missing_street_type=None):
+    is_us = df['country_code'].str.upper() == 'US'
+    parsed, failed = _parse_rows(df[full_address_col], is_us)
 
-            return pd.Series({
-                'address_number': parsed.get('street_number', '').upper().strip() if parsed.get('street_number') else None,
-                'street_name': parsed.get('street_name', '').upper().strip() if parsed.get('street_name') else None,
-                'street_type': None,
-                'unit_type': None,
-                'unit_number': None,
-                'city': parsed.get('city', row['city']).upper().strip() if parsed.get('city') else row['city'].upper().strip(),
-                'state': None,
-                'state_code': None,
-                'country': row['country_code'].upper().strip(),
-                'country_code': row['country_code'].upper().strip(),
-                'zip': parsed.get('postal_code', row['zip']).upper().strip() if parsed.get('postal_code') else row['zip'].upper().strip(),
-                'zip_cleaned': row['zip_cleaned'].upper().strip() if row['zip_cleaned'] else None
-            })
+    # Standardize street type using mapping, across the whole column
+    street_types = _parsed_column(parsed, 'StreetNamePostType').str.upper().str.strip()
+    standardized_street_type = street_types.str.rstrip('.').map(street_type_mapping).fillna(street_types)
+    if missing_street_type is not None:
+        standardized_street_type = standardized_street_type.fillna(missing_street_type)
 
-    except Exception as e:
-        return pd.Series({
-            'address_number': None,
-            'street_name': None,
-            'street_type': None,
-            'unit_type': None,
-            'unit_number': None,
-            'city': None,
-            'state': None,
-            'state_code': None,
-            'country': None,
-            'country_code': None,
-            'zip': None,
-            'zip_cleaned': None
-        })
+    # Parsed components fall back to the raw columns; everything is upper-cased and stripped once in _finalize
+    address_number = _parsed_column(parsed, 'AddressNumber').where(is_us, _parsed_column(parsed, 'street_number'))
+    if normalize_num:
+        address_number = normalize_house_numbers(address_number.fillna('').str.strip())
+    street_name = _parsed_column(parsed, 'StreetName').where(is_us, _parsed_column(parsed, 'street_name'))
+    city = _parsed_column(parsed, 'PlaceName').where(is_us, _parsed_column(parsed, 'city'))
+    state = _parsed_column(parsed, 'StateName')
+    zip_code = _parsed_column(parsed, 'ZipCode').where(is_us, _parsed_column(parsed, 'postal_code'))
+
+    standardized = pd.DataFrame({
+        'address_number': address_number,
+        'street_name': street_name,
+        'street_type': standardized_street_type.where(is_us),
+        'unit_type': _parsed_column(parsed, 'OccupancyType').where(is_us),
+        'unit_number': _parsed_column(parsed, 'OccupancyIdentifier').where(is_us),
+        'city': city.where(city.notna(), df['city']),
+        'state': state.where(state.notna(), df['state']).where(is_us),
+        'state_code': state.where(state.notna(), df['state_code']).where(is_us),
+        'country': df['country'],
+        'country_code': df['country_code'],
+        'zip': zip_code.where(zip_code.notna(), df['zip']),
+        'zip_cleaned': df['zip_cleaned'].where(df['zip_cleaned'] != '')
+    }, index=df.index)
+    return _finalize(standardized, failed)
 
-    
 def split_full_name(full_name):
     # Remove punctuation from the full name
     full_name = full_name.translate(str.maketrans('', '', string.punctuation))
@@ -320,16 +282,47 @@ def split_full_name(full_name):
         return pd.Series([parts[0], parts[1], parts[2]])
     else:
         return pd.Series([parts[0], ' '.join(parts[1:-1]), parts[-1]])
+
+def split_full_name_series(full_names):
+    """Split a Series of full names into first, middle, and last names column-wise, with the same rules as split_full_name"""
+    # Remove punctuation and collapse whitespace so the first and last spaces separate the name parts.
+    # Work on Python strings so str.split() splits on the same Unicode whitespace as split_full_name
+    cleaned = full_names.astype(object).fillna('').str.translate(str.maketrans('', '', string.punctuation))
+    cleaned = cleaned.str.split().str.join(' ')
+    first = cleaned.str.partition(' ')
+    middle_last = first[2].str.rpartition(' ')
+    return pd.DataFrame({
+        'first_name': first[0],
+        'middle_name': middle_last[0],
+        'last_name': middle_last[2]
+    }, index=full_names.index)
     
 
 def normalize_house_number(num):
-    """Normalize house numbers by removing non-numeric characters and converting to string"""
+    """Normalize house numbers by removing spaces and leading zeros and converting to string"""
     if pd.isna(num) or str(num).strip() == '':
         return ''
     num_str = str(num).replace(' ', '')
     if not num_str.isdigit():
         return num_str
-    return str(float(num_str)).rstrip('0').rstrip('.')
+    return num_str.lstrip('0') or '0'
+
+def normalize_house_numbers(nums):
+    """Normalize a Series of house numbers column-wise, with the same rules as normalize_house_number"""
+    num_str = nums.astype(str).str.replace(' ', '', regex=False)
+    is_digit = num_str.str.isdigit()
+    # Only leading zeros are dropped from all-digit numbers, keeping at least one digit
+    numeric = num_str.str.lstrip('0').replace('', '0')
+    normalized = num_str.where(~is_digit, numeric)
+    return normalized.where(nums.notna() & (nums.astype(str).str.strip() != ''), '')
+
+def standardize_canadian_zips(zips):
+    """Strip non-alphanumeric characters from a Series of Canadian postal codes, with NaN where the result is not 6 characters"""
+    if pd.api.types.is_numeric_dtype(zips):
+        # An all-numeric column can't hold a valid Canadian postal code
+        return pd.Series(np.nan, index=zips.index, dtype=object)
+    standardized = zips.str.replace(r'[\W_]', '', regex=True)
+    return standardized.where(standardized.str.len() == 6)
 
 state_to_country = {
     # United States (US)
@@ -3,7 +3,7 @@ This module provides functions to load and preprocess Shopify and Amazon data, i
 
 Functions:
 - load_shopify_data(): Loads and preprocesses Shopify data from a CSV file.
-- load_amazon_data(path=None): Loads and preprocesses Amazon data from a CSV file.
+- load_amazon_data(path=None, test=False, backend='pandas'): Loads and preprocesses Amazon data from a CSV file.
 
 load_shopify_data():
     Loads and preprocesses Shopify data from a CSV file.
@@ -15,12 +15,12 @@ load_shopify_data():
     4. Split 'full_name' into 'first_name', 'middle_name', and 'last_name'.
     5. Convert name columns to uppercase and create 'middle_initial'.
     6. Standardize addresses.
-    7. Save cleaned data to 'TEMP_shopify_clean.csv'.
+    7. Save cleaned data to 'TEMP_shopify_clean.parquet'.
 
     Returns:
         pd.DataFrame: Preprocessed Shopify data.
 
-load_amazon_data(path=None):
+load_amazon_data(path=None, test=False, backend='pandas'):
     Loads and preprocesses Amazon data from a CSV file.
 
     Steps:
@@ -30,10 +30,13 @@ load_amazon_data(path=None):
     4. Convert name columns to uppercase and create 'middle_initial'.
     5. Map country names to codes and clean state/zip codes.
     6. Standardize addresses.
-    7. Save cleaned data to 'TEMP_amazon_clean.csv'.
+    7. Save cleaned data to 'TEMP_amazon_clean.parquet'.
 
     Args:
         path (str, optional): File path to the Amazon data CSV file. Defaults to None.
+        test (bool, optional): Sample 5% of rows and skip saving. Defaults to False.
+        backend (str, optional): 'pandas', or 'polars' to read, rename and filter the CSV with Polars before
+            handing a pandas DataFrame to the rest of the pipeline. Defaults to 'pandas'.
 
     Returns:
         pd.DataFrame: Preprocessed Amazon data.
@@ -42,23 +45,43 @@ load_amazon_data(path=None):
 import pandas as pd
 import numpy as np
 import string
-from data_science.address_utils import standardize_address_amazon
-from data_science.address_utils import standardize_address_shopify
-from data_science.address_utils import standardize_address_netsuite
-from data_science.address_utils import split_full_name
+from data_science.address_utils import standardize_addresses
+from data_science.address_utils import split_full_name_series
 from data_science.address_utils import state_to_country
-from tqdm import tqdm
-import hashlib
+from data_science.address_utils import standardize_canadian_zips
+import xxhash
+import pyarrow.csv as pacsv
 
 
-tqdm.pandas()
+# Raw columns standardize_addresses reads besides the address line itself
+address_columns = ['city', 'state', 'state_code', 'country', 'country_code', 'zip', 'zip_cleaned']
+
+
+def _read_positional_csv(file_path, column_names):
+    # Only convert the leading columns a positional schema uses, renaming them as they are read
+    with pacsv.open_csv(file_path) as reader:
+        header = reader.schema.names
+    table = pacsv.read_csv(file_path, convert_options=pacsv.ConvertOptions(
+        include_columns=header[:len(column_names)], strings_can_be_null=True
+    ))
+    return table.rename_columns(column_names).to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def _map_categories(values, mapping):
+    # Map a low-cardinality column through a dict once per distinct value, broadcasting through the category codes
+    # Values missing from the mapping (and NaN, code -1) map to NaN, as with Series.map
+    categorical = pd.Categorical(values)
+    code_map = np.array([mapping.get(category, np.nan) for category in categorical.categories] + [np.nan], dtype=object)
+    return pd.Series(code_map[categorical.codes], index=values.index)
+
 
 def load_shopify_data(path=None, test=False, use_cache=False):
     # https://app.snowflake.com/loracbl/ilb81531/wZERO5Cnsuu#query
 
     if use_cache:
         try:
-            return pd.read_csv('TEMP_shopify_clean.csv').fillna('')
+            # Parquet keeps the dtypes and missing values the pipeline produced, so nothing needs re-filling
+            return pd.read_parquet('TEMP_shopify_clean.parquet')
         except FileNotFoundError:
             pass
     
@@ -68,13 +91,13 @@ def load_shopify_data(path=None, test=False, use_cache=False):
     else:
         file_path = path
 
-    shopify_data = pd.read_csv(file_path)
+    df_shopify = pd.read_csv(file_path, engine='pyarrow', dtype_backend='pyarrow')
 
     # Convert column names to lowercase
-    shopify_data.columns = shopify_data.columns.str.lower()
+    df_shopify.columns = df_shopify.columns.str.lower()
 
     if test:
-        shopify_data = shopify_data.sample(frac=0.05)
+        df_shopify = df_shopify.sample(frac=0.05)
 
     # List of columns to convert to datetime
     date_columns = [
@@ -86,36 +109,33 @@ def load_shopify_data(path=None, test=False, use_cache=False):
 
     # Convert date columns to pandas datetime
     for col in date_columns:
-        shopify_data[col] = pd.to_datetime(shopify_data[col], errors='coerce')
+        df_shopify[col] = pd.to_datetime(df_shopify[col], format='ISO8601', errors='coerce')
 
     # Function to split full_name into first, middle, and last names
     # Apply the function to the full_name column
     print('Running shopify name recognition')
-    shopify_data[['first_name', 'middle_name', 'last_name']] = shopify_data['full_name'].fillna('').progress_apply(
-        lambda x: pd.Series(split_full_name(x))
-    )
+    df_shopify[['first_name', 'middle_name', 'last_name']] = split_full_name_series(df_shopify['full_name'].fillna(''))
 
     # Convert first_name, middle_name, and last_name to uppercase
-    shopify_data['first_name'] = shopify_data['first_name'].str.upper()
-    shopify_data['middle_name'] = shopify_data['middle_name'].str.upper()
-    shopify_data['last_name'] = shopify_data['last_name'].str.upper()
+    df_shopify['first_name'] = df_shopify['first_name'].str.upper()
+    df_shopify['middle_name'] = df_shopify['middle_name'].str.upper()
+    df_shopify['last_name'] = df_shopify['last_name'].str.upper()
 
     # Create a middle_initial column
-    shopify_data['middle_initial'] = shopify_data['middle_name'].str[0]
-
-    # ✅ Create Shopify DataFrame
-    df_shopify = pd.DataFrame(shopify_data)
+    df_shopify['middle_initial'] = df_shopify['middle_name'].str[0]
 
     print('Running shopify address tokenization')
-    # ✅ Apply standardize_address with tqdm progress bar
-    standardized_df = df_shopify.progress_apply(
-        lambda row: pd.Series(standardize_address_shopify(row.fillna('').astype(str))),
-        axis=1
+    # ✅ Standardize all addresses column-wise in a single call
+    standardized_df = standardize_addresses(
+        df_shopify[['full_address'] + address_columns].astype('string').fillna('').astype(str), 'full_address',
+        normalize_num=True, missing_street_type=''
     )
 
     # ✅ Combine original DataFrame with standardized data, keeping only standardized_df columns in case of duplicates
+    # Assign columns in place rather than concatenating, which would copy every block
     df_shopify = df_shopify.drop(columns=standardized_df.columns, errors='ignore')
-    df_shopify = pd.concat([df_shopify, standardized_df], axis=1)
+    for column in standardized_df.columns:
+        df_shopify[column] = standardized_df[column]
 
     # Drop rows where all standardized address fields are null
     df_shopify = df_shopify.dropna(subset=[
@@ -126,84 +146,93 @@ def load_shopify_data(path=None, test=False, use_cache=False):
     df_shopify['shopify_id'] = df_shopify['customer_id'] # just for match algo cleanliness
 
     if not test:
-        df_shopify.to_csv('TEMP_shopify_clean.csv', index=False)
+        df_shopify.to_parquet('TEMP_shopify_clean.parquet', compression='zstd')
 
     return df_shopify
 
 
-def load_amazon_data(path=None, test=False):
+# Amazon exports are renamed positionally to these columns
+amazon_columns = [
+    'provider', 
+    'order_id',
+    'order_date',
+    'first_name',
+    'last_name',   
+    'full_name',
+    'email_amzn',
+    'address', 
+    'city', 
+    'state', 
+    'zip', 
+    'country',
+    'skus', 
+    'qty', 
+    'sku', 
+    'subtotals'
+]
+
+# Dictionary to map country names to country codes
+country_mapping = {
+    'US': 'US',
+    'United States': 'US',
+    'CA': 'CA',
+    'British Columbia': 'CA',
+    'Canada': 'CA',
+    'New Zealand': 'NZ',
+    'Hong Kong (SAR)': 'HK',
+    'United Arab Emirates': 'AE',
+    'Indonesia': 'ID',
+    'United States Minor Outlying Island': 'UM'
+}
+
+
+def _read_amazon_data_polars(file_path):
+    # Polars fuses the read, rename, country mapping and filter into one multithreaded plan,
+    # then hands a pandas DataFrame back so the rest of the pipeline is unchanged
+    import polars as pl
+
+    # Read every column as text: schema inference only samples the first rows, so a late Canadian zip
+    # would fail to parse as an integer, and zips must stay strings as in the pandas backend
+    amazon_data = pl.scan_csv(file_path, infer_schema=False)
+    amazon_data = amazon_data.rename(dict(zip(amazon_data.collect_schema().names(), amazon_columns)))
+    amazon_data = amazon_data.with_columns(
+        pl.col('country').replace_strict(country_mapping, default=None).alias('country_code')
+    ).filter(pl.col('country_code').is_not_null())
+    return amazon_data.collect().to_pandas()
+
+
+def load_amazon_data(path=None, test=False, backend='pandas'):
     # Load Amazon data
     if path is None: 
         file_path = 'data_science/amazon_emails.csv'
     else: 
        file_path = path
 
+    if backend == 'polars':
+        df_amazon = _read_amazon_data_polars(file_path)
+    else:
+        df_amazon = _read_positional_csv(file_path, amazon_columns)
 
-    amazon_data = pd.read_csv(file_path)
-
-    if test: 
-        amazon_data = amazon_data.sample(frac=0.05)
-
-    # Convert column names to lowercase
-    amazon_data.columns = amazon_data.columns.str.lower()
-
-    amazon_data.columns = [
-        'provider', 
-        'order_id',
-        'order_date',
-        'first_name',
-        'last_name',   
-        'full_name',
-        'email_amzn',
-        'address', 
-        'city', 
-        'state', 
-        'zip', 
-        'country',
-        'skus', 
-        'qty', 
-        'sku', 
-        'subtotals'
-    ]
+        # Convert country names to country codes
+        df_amazon['country_code'] = _map_categories(df_amazon['country'], country_mapping)
 
+        # Drop rows where country_code is NaN (i.e., countries not in the mapping)
+        df_amazon = df_amazon.dropna(subset=['country_code'])
 
+    if test: 
+        df_amazon = df_amazon.sample(frac=0.05)
 
     # Function to split full_name into first, middle, and last names
-    amazon_data[['first_name', 'middle_name', 'last_name']] = amazon_data['full_name'].astype('str').progress_apply(
-        lambda x: pd.Series(split_full_name(x))
-    )
+    df_amazon[['first_name', 'middle_name', 'last_name']] = split_full_name_series(df_amazon['full_name'].astype('str'))
     
     print('Running amazon name recognition')
     # Convert first_name, middle_name, and last_name to uppercase
-    amazon_data['first_name'] = amazon_data['first_name'].str.upper()
-    amazon_data['middle_name'] = amazon_data['middle_name'].str.upper()
-    amazon_data['last_name'] = amazon_data['last_name'].str.upper()
+    df_amazon['first_name'] = df_amazon['first_name'].str.upper()
+    df_amazon['middle_name'] = df_amazon['middle_name'].str.upper()
+    df_amazon['last_name'] = df_amazon['last_name'].str.upper()
 
     # Create a middle_initial column
-    amazon_data['middle_initial'] = amazon_data['middle_name'].str[0]
-
-    # Dictionary to map country names to country codes
-    country_mapping = {
-        'US': 'US',
-        'United States': 'US',
-        'CA': 'CA',
-        'British Columbia': 'CA',
-        'Canada': 'CA',
-        'New Zealand': 'NZ',
-        'Hong Kong (SAR)': 'HK',
-        'United Arab Emirates': 'AE',
-        'Indonesia': 'ID',
-        'United States Minor Outlying Island': 'UM'
-    }
-
-    # Convert country names to country codes
-    amazon_data['country_code'] = amazon_data['country'].map(country_mapping)
-
-    # Drop rows where country_code is NaN (i.e., countries not in the mapping)
-    amazon_data = amazon_data.dropna(subset=['country_code'])
-
-    # ✅ Create Amazon DataFrame
-    df_amazon = pd.DataFrame(amazon_data)
+    df_amazon['middle_initial'] = df_amazon['middle_name'].str[0]
 
     # Clean up to work cleanly with Amazon data
     df_amazon['state_code'] = df_amazon['state'].str.upper()
@@ -213,22 +242,12 @@ def load_amazon_data(path=None, test=False):
                              (df_amazon['state_code'].str.len() != 2)))]
 
     # Isolate zip to the first 5 digits and create a new column 'zip_cleaned' only when country_code = 'US'
-    df_amazon['zip_cleaned'] = df_amazon.apply(
-        lambda row: row['zip'][:5] if row['country_code'] == 'US' else row['zip'], axis=1
+    df_amazon['zip_cleaned'] = np.where(
+        df_amazon['country_code'].eq('US'), df_amazon['zip'].str.slice(0, 5), df_amazon['zip']
     )
-    # Standardize Canadian zip codes
-    def standardize_canadian_zip(zip_code):
-        # Remove spaces and special characters
-        standardized_zip = ''.join(e for e in zip_code if e.isalnum())
-        # Ensure it is a 6 character string
-        if len(standardized_zip) == 6:
-            return standardized_zip
-        else:
-            return np.nan
-
-    # Apply the standardization function to Canadian zip codes
-    df_amazon['zip_cleaned'] = df_amazon.apply(
-        lambda row: standardize_canadian_zip(row['zip']) if row['country_code'] == 'CA' else row['zip_cleaned'], axis=1
+    # Standardize Canadian zip codes column-wise
+    df_amazon['zip_cleaned'] = df_amazon['zip_cleaned'].mask(
+        df_amazon['country_code'] == 'CA', standardize_canadian_zips(df_amazon['zip'])
     )
 
     # Drop rows with invalid Canadian zip codes
@@ -237,18 +256,25 @@ def load_amazon_data(path=None, test=False):
     # Drop rows where order_date or full_name is NaN
     df_amazon = df_amazon.dropna(subset=['order_date', 'full_name']) # this data is useless
 
-    df_amazon = df_amazon.fillna('') # String coercion 
+    # String coercion, only on columns holding strings so numeric columns keep their dtype and missing values,
+    # which also keeps every column writable to the Parquet checkpoint
+    string_columns = [
+        column for column in df_amazon
+        if pd.api.types.infer_dtype(df_amazon[column], skipna=True) in ('string', 'empty')
+    ]
+    df_amazon = df_amazon.fillna({column: '' for column in string_columns})
 
     print('Running amazon address tokenization')
-    # ✅ Apply standardize_address with tqdm progress bar
-    standardized_df = df_amazon.progress_apply(
-        lambda row: pd.Series(standardize_address_amazon(row.astype(str))),
-        axis=1
+    # ✅ Standardize all addresses column-wise in a single call
+    standardized_df = standardize_addresses(
+        df_amazon[['address'] + address_columns].astype('string').fillna('').astype(str), 'address'
     )
 
     # ✅ Combine original DataFrame with standardized data, keeping only standardized_df columns in case of duplicates
+    # Assign columns in place rather than concatenating, which would copy every block
     df_amazon = df_amazon.drop(columns=standardized_df.columns, errors='ignore')
-    df_amazon = pd.concat([df_amazon, standardized_df], axis=1)
+    for column in standardized_df.columns:
+        df_amazon[column] = standardized_df[column]
 
     # Drop rows where all standardized address fields are null
     df_amazon = df_amazon.dropna(subset=[
@@ -256,73 +282,74 @@ def load_amazon_data(path=None, test=False):
         'city', 'state', 'state_code', 'country', 'country_code', 'zip', 'zip_cleaned'
     ], how='all')
 
-    def generate_amazon_id(row):
-        # Concatenate the relevant fields
-        data = f"{row['full_name']}_{row['order_date']}_{row['zip_cleaned']}"
-        # Generate a hash of the concatenated string
-        return hashlib.sha256(data.encode()).hexdigest()
-
     # Generate a unique amazon_id using full_name, order_date, and zip_cleaned
-    df_amazon['amazon_id'] = df_amazon.apply(generate_amazon_id, axis=1)
+    # Build the keys column-wise once, then hash them with a 64-bit hash; the id only needs to be unique, not cryptographic
+    amazon_keys = df_amazon['full_name'].astype(str).str.cat(
+        [df_amazon['order_date'].astype(str), df_amazon['zip_cleaned'].astype(str)], sep='_'
+    )
+    df_amazon['amazon_id'] = [xxhash.xxh3_64_hexdigest(key.encode()) for key in amazon_keys]
 
     if not test:
-        df_amazon.to_csv('TEMP_amazon_clean.csv', index=False)
+        df_amazon.to_parquet('TEMP_amazon_clean.parquet', compression='zstd')
     
     return df_amazon
 
 
+# NetSuite exports are renamed positionally to these columns
+netsuite_columns = [
+    'internal_id',
+    'date',
+    'document_number', 
+    'order_name', 
+    'address_1', 
+    'address_2', 
+    'city',
+    'state', 
+    'zip'   
+]
+
+
 def load_netsuite_data(path, test=False): 
     print('loading latest netsuite data from file {}'.format(path))   
-    netsuite = pd.read_csv(path)
-    netsuite.columns = [
-        'internal_id',
-        'date',
-        'document_number', 
-        'order_name', 
-        'address_1', 
-        'address_2', 
-        'city',
-        'state', 
-        'zip'   
-    ]
+    netsuite = _read_positional_csv(path, netsuite_columns)
 
     netsuite = netsuite.replace(
         '(blank)', ''
     )
 
-    netsuite['country_code'] = netsuite['state'].map(state_to_country)
-
-        # Step 1: Isolate U.S. zip codes to first 5 digits
-    netsuite['zip_cleaned'] = netsuite.apply(
-        lambda row: row['zip'][:5] if row['country_code'] == 'US' and isinstance(row['zip'], str) else row['zip'],
-        axis=1
-    )
+    netsuite['country_code'] = _map_categories(netsuite['state'], state_to_country)
 
-    # Step 2: Define Canadian zip standardization
-    def standardize_canadian_zip(zip_code):
-        if not isinstance(zip_code, str):
-            return np.nan
-        # Remove spaces and special characters
-        standardized_zip = ''.join(e for e in zip_code if e.isalnum())
-        # Ensure it's a 6-character alphanumeric string
-        return standardized_zip if len(standardized_zip) == 6 else np.nan
-
-    # Step 3: Apply to Canadian zips
-    netsuite['zip_cleaned'] = netsuite.apply(
-        lambda row: standardize_canadian_zip(row['zip']) if row['country_code'] == 'CA' else row['zip_cleaned'],
-        axis=1
+    # Step 1: Isolate U.S. zip codes to first 5 digits, leaving non-string zips untouched
+    if pd.api.types.is_numeric_dtype(netsuite['zip']):
+        netsuite['zip_cleaned'] = netsuite['zip']
+    else:
+        sliced_zip = netsuite['zip'].str.slice(0, 5)
+        netsuite['zip_cleaned'] = np.where(
+            netsuite['country_code'].eq('US') & sliced_zip.notna(), sliced_zip, netsuite['zip']
+        )
+
+    # Step 2: Standardize Canadian zips column-wise
+    netsuite['zip_cleaned'] = netsuite['zip_cleaned'].mask(
+        netsuite['country_code'] == 'CA', standardize_canadian_zips(netsuite['zip'])
     )
 
     print('Running netsuite address tokenization')
-    # ✅ Apply standardize_address with tqdm progress bar
-    standardized_df = netsuite.progress_apply(
-        lambda row: pd.Series(standardize_address_netsuite(row.astype(str))),
-        axis=1
-    )
+    # ✅ Standardize all addresses column-wise in a single call
+    netsuite_strings = netsuite[
+        ['address_1', 'address_2', 'city', 'state', 'country_code', 'zip', 'zip_cleaned']
+    ].astype('string').fillna('').astype(str)
+    # Combine address_1 and address_2, with a comma for better parsing; NetSuite only has a state and a country code
+    standardized_df = standardize_addresses(netsuite_strings.assign(
+        full_address=(netsuite_strings['address_1'] + ', ' + netsuite_strings['address_2']).str.strip(', '),
+        country=netsuite_strings['country_code'],
+        state_code=netsuite_strings['state']
+    ))
 
         # ✅ Combine original DataFrame with standardized data, keeping only standardized_df columns in case of duplicates
+    # Assign columns in place rather than concatenating, which would copy every block
     netsuite = netsuite.drop(columns=standardized_df.columns, errors='ignore')
-    netsuite = pd.concat([netsuite, standardized_df], axis=1)
+    for column in standardized_df.columns:
+        netsuite[column] = standardized_df[column]
 
     # Drop rows where all standardized address fields are null
     netsuite = netsuite.dropna(subset=[
@@ -334,7 +361,7 @@ def load_netsuite_data(path, test=False):
     netsuite['amazon_id'] = netsuite['internal_id'] # just for match algo cleanliness
 
     if not test:
-        netsuite.to_csv('TEMP_netsuite_clean.csv', index=False)
+        netsuite.to_parquet('TEMP_netsuite_clean.parquet', compression='zstd')
 
     return netsuite
 
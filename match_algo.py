@@ -1,14 +1,20 @@
+import os
+import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 from data_science.address_utils import matchable_columns
 from tqdm import tqdm 
-from fuzzywuzzy import fuzz
+from rapidfuzz import fuzz, process
+from rapidfuzz.distance import JaroWinkler
 
 # Default weights (Sum = 1.0 without zip_cleaned)
 default_weights = {
     'last_name': 0.25,
     'unit_number': 0.18,
     'street_name': 0.18,
-    'house_number': 0.15,
+    'address_number': 0.15,
     'state': 0.05,
     'first_name': 0.04,
     'city': 0.03,
@@ -19,15 +25,27 @@ default_weights = {
 no_name_weights = {
     'unit_number': 0.2381,
     'street_name': 0.2381,
-    'house_number': 0.1905,
+    'address_number': 0.1905,
     'state': 0.0476,
     'city': 0.0476,
     'street_type': 0.0476,
     'unit_type': 0.0476,
 }
 
+# Exact match fields (No fuzzy matching needed)
+exact_match_fields = ['street_type', 'state', 'unit_type']
+
+# Short hand-typed fields scored with Jaro-Winkler; other fuzzy fields keep fuzz.ratio, where digit-level edits matter
+jaro_winkler_fields = ['last_name', 'first_name', 'street_name', 'city']
+
 potential_match_score_threshold = 60
 
+# Below this many candidate pairs, matching serially beats paying for process startup
+parallel_match_threshold = 1_000_000
+
+# Zip buckets are mostly tiny, so only redraw the progress bar every so often
+progress_options = {'mininterval': 0.5, 'miniters': 100, 'smoothing': 0.05}
+
 # Confidence levels
 confidence_levels = {
     'near-exact': 90,
@@ -37,17 +55,23 @@ confidence_levels = {
 }
 
 def identify_matches(shopify_in, amazon_in,  no_name=False,
-        threshold=potential_match_score_threshold, confidence_levels=confidence_levels
+        threshold=potential_match_score_threshold, confidence_levels=confidence_levels, engine='rapidfuzz'
     ):
     '''
     Identify potential matches between Shopify and Amazon datasets based on address information.
+    Pairs are only scored when their address_number values pass a fuzz.ratio >= 70 house number check, so pairs whose
+    house numbers differ, or where either side has none, never match. Earlier versions read a 'house_number' column
+    that no loader produces, so the check never fired.
     Parameters:
     shopify_in (pd.DataFrame): Input DataFrame containing Shopify data with columns 'shopify_id' and matchable columns.
     amazon_in (pd.DataFrame): Input DataFrame containing Amazon data with columns 'amazon_id' and matchable columns.
     threshold (float): The minimum match score required to consider a pair as a potential match. Default is potential_match_score_threshold.
     confidence_levels (dict): Dictionary defining the confidence levels based on match scores.
+    engine (str): 'rapidfuzz' to score zip buckets in Python with RapidFuzz, or 'duckdb' to join and score in a single
+        DuckDB query. DuckDB has no fuzz.ratio, so it scores every fuzzy field with Jaro-Winkler similarity and the
+        house number check with a Levenshtein distance of at most 1. Default is 'rapidfuzz'.
     Returns:
-    list: A list of dictionaries, each containing:
+    pd.DataFrame: One row per match, with columns:
         - 'shopify_id': The Shopify ID of the matched entry.
         - 'amazon_id': The Amazon ID of the matched entry.
         - 'score': The match score between the Shopify and Amazon entries.
@@ -65,87 +89,343 @@ def identify_matches(shopify_in, amazon_in,  no_name=False,
     amazon_cols = ['amazon_id'] + filtered_columns
     amazon = amazon_in[amazon_cols]
 
-    # First identify only zip_cleaned that are in both dfs
-    zip_codes = set(shopify['zip_cleaned']).intersection(set(amazon['zip_cleaned']))
+    # First identify only zip_cleaned that are in both dfs. Each side is sorted by zip once,
+    # so every zip is a contiguous run of rows found by binary search
+    shopify_order, shopify_zips = _sort_by_zip(shopify['zip_cleaned'])
+    amazon_order, amazon_zips = _sort_by_zip(amazon['zip_cleaned'])
+    zip_codes = np.intersect1d(pd.unique(shopify_zips), pd.unique(amazon_zips), assume_unique=True)
     
     print('There are an overlap of {} zip codes'.format(len(zip_codes)))
 
-    matches = []
-
-    for zip_code in tqdm(zip_codes):
-        shopify_subset = shopify[shopify['zip_cleaned'] == zip_code]
-        amazon_subset = amazon[amazon['zip_cleaned'] == zip_code]
-
-        for _, shopify_row in shopify_subset.iterrows():
-            for _, amazon_row in amazon_subset.iterrows():
-                try:
-                    if no_name:
-                        score = calculate_match_score(shopify_row, amazon_row, no_name_weights)
-                    else:
-                        score = calculate_match_score(shopify_row, amazon_row, default_weights)
-                    if score > threshold:
-                        for level, min_score in confidence_levels.items():
-                            if score >= min_score:
-                                confidence_level = level
-                                break
-                        matches.append({
-                            'shopify_id': shopify_row['shopify_id'],
-                            'amazon_id': amazon_row['amazon_id'],
-                            'score': score,
-                            'confidence_level': confidence_level
-                        })
-                except Exception as e:
-                    print(f"Error processing rows: {e}")
-                    matches.append({
-                        'shopify_id': shopify_row['shopify_id'],
-                        'amazon_id': amazon_row['amazon_id'],
-                        'score': None,
-                        'confidence_level': None
-                    })
-
-    return pd.DataFrame(matches)
+    weights = no_name_weights if no_name else default_weights
+
+    if engine == 'duckdb':
+        return _assign_confidence_levels(_identify_matches_duckdb(shopify, amazon, weights, threshold), confidence_levels)
+
+    shopify_starts = np.searchsorted(shopify_zips, zip_codes, side='left')
+    shopify_ends = np.searchsorted(shopify_zips, zip_codes, side='right')
+    amazon_starts = np.searchsorted(amazon_zips, zip_codes, side='left')
+    amazon_ends = np.searchsorted(amazon_zips, zip_codes, side='right')
+
+    # Pull every scored field out as a plain array in zip order once, so zip buckets are zero-copy slices
+    shopify = shopify.iloc[shopify_order]
+    amazon = amazon.iloc[amazon_order]
+    shopify_fields, amazon_fields = _encode_exact_fields(_field_arrays(shopify, weights), _field_arrays(amazon, weights))
+
+    candidate_pairs = int(np.sum((shopify_ends - shopify_starts) * (amazon_ends - amazon_starts)))
+
+    shopify_buckets = (
+        {field: values[start:end] for field, values in shopify_fields.items()}
+        for start, end in zip(shopify_starts, shopify_ends)
+    )
+    amazon_buckets = (
+        {field: values[start:end] for field, values in amazon_fields.items()}
+        for start, end in zip(amazon_starts, amazon_ends)
+    )
+
+    # Zip buckets are independent, so spread large runs across processes
+    if candidate_pairs < parallel_match_threshold:
+        bucket_results = (
+            _match_bucket(shopify_bucket, amazon_bucket, weights, threshold)
+            for shopify_bucket, amazon_bucket in zip(shopify_buckets, amazon_buckets)
+        )
+        match_shopify_positions, match_amazon_positions, match_scores = _collect_matches(
+            shopify_starts, amazon_starts, tqdm(bucket_results, total=len(zip_codes), **progress_options)
+        )
+    else:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            bucket_results = executor.map(
+                _match_bucket, shopify_buckets, amazon_buckets, repeat(weights), repeat(threshold), chunksize=16
+            )
+            match_shopify_positions, match_amazon_positions, match_scores = _collect_matches(
+                shopify_starts, amazon_starts, tqdm(bucket_results, total=len(zip_codes), **progress_options)
+            )
 
+    matches = pd.DataFrame({
+        'shopify_id': shopify['shopify_id'].to_numpy()[match_shopify_positions],
+        'amazon_id': amazon['amazon_id'].to_numpy()[match_amazon_positions],
+        'score': match_scores
+    })
+
+    return _assign_confidence_levels(matches, confidence_levels)
 
-def calculate_match_score(shopify_row, amazon_row, weights=default_weights):
-    """
-    Calculate a weighted match score between Shopify and Amazon address records.
-    Assumes zip_code has been pre-filtered and is not included in the scoring.
 
-    Output is scaled to 0-100
+def _collect_matches(shopify_starts, amazon_starts, bucket_results):
+    """
+    Gather each bucket's matches as it arrives, shifted from bucket positions to sorted-frame positions,
+    and join them once at the end. Only the matches are held, never a buffer sized for every candidate pair.
+    """
+    shopify_positions, amazon_positions, scores = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)], [np.empty(0)]
+    for shopify_start, amazon_start, (rows, cols, bucket_scores) in zip(shopify_starts, amazon_starts, bucket_results):
+        if len(rows):
+            shopify_positions.append(shopify_start + rows)
+            amazon_positions.append(amazon_start + cols)
+            scores.append(bucket_scores)
+    return np.concatenate(shopify_positions), np.concatenate(amazon_positions), np.concatenate(scores)
+
+def _sort_by_zip(zips):
+    """Return the row positions that sort zips, leaving out missing zips since they never match, and the sorted zips"""
+    positions = np.flatnonzero(zips.notna().to_numpy())
+    values = zips.to_numpy(dtype=object)[positions]
+    order = np.argsort(values, kind='stable')
+    return positions[order], values[order]
+
+def _assign_confidence_levels(matches, confidence_levels):
+    """Give each match the highest confidence level whose minimum score it reaches"""
+    levels = sorted(confidence_levels.items(), key=lambda item: item[1])
+    matches['confidence_level'] = pd.cut(
+        matches['score'],
+        bins=[min_score for _, min_score in levels] + [np.inf],
+        labels=[level for level, _ in levels],
+        right=False
+    ).astype(object)
+    return matches
+
+
+def _identify_matches_duckdb(shopify, amazon, weights, threshold):
+    """Join on zip_cleaned, gate on house number and score every pair in one DuckDB query"""
+    import duckdb
+
+    score_terms = []
+    for field, weight in weights.items():
+        if field in exact_match_fields:
+            score_terms.append(f'{weight} * CAST(s.{field} IS NOT DISTINCT FROM a.{field} AS DOUBLE)')
+        else:
+            score_terms.append(f'{weight} * COALESCE(jaro_winkler_similarity(s.{field}, a.{field}), 0)')
+
+    query = f"""
+        SELECT shopify_id, amazon_id, score
+        FROM (
+            SELECT s.shopify_id, a.amazon_id, ROUND(({' + '.join(score_terms)}) * 100, 2) AS score
+            FROM shopify AS s
+            JOIN amazon AS a USING (zip_cleaned)
+            WHERE levenshtein(s.address_number, a.address_number) <= 1
+        )
+        WHERE score > {threshold}
     """
+    with duckdb.connect() as con:
+        con.register('shopify', shopify)
+        con.register('amazon', amazon)
+        return con.execute(query).df()
+
+
+def _match_bucket(shopify_fields, amazon_fields, weights, threshold):
+    """Score one zip bucket, returning the bucket positions and scores of pairs over the threshold"""
+    # Score every Shopify x Amazon pair in the zip at once, keeping only the candidates that came back
+    rows, cols, scores = _score_pairs(shopify_fields, amazon_fields, weights, threshold)
+    over_threshold = scores > threshold
+    return rows[over_threshold], cols[over_threshold], scores[over_threshold]
+
+def _field_values(df, field):
+    """Return a field as an upper-cased, stripped object array with None for missing values, or '' when the column is missing"""
+    if field not in df:
+        return np.full(len(df), '', dtype=object)
+    values = df[field]
+    if pd.api.types.infer_dtype(values, skipna=True) in ('string', 'empty'):
+        # Normalize once per column, so the scorers can compare raw strings with no processor
+        values = values.str.upper().str.strip()
+    return values.to_numpy(dtype=object, na_value=None)
+
+def _field_arrays(df, weights):
+    """Return each weighted field, plus address_number for the house number check, as a dict of object arrays"""
+    return {field: _field_values(df, field) for field in list(weights) + ['address_number']}
+
+def _encode_exact_fields(shopify_fields, amazon_fields):
+    """Replace exact-match fields with integer codes shared by both sides, so equality is an integer compare"""
+    for field in exact_match_fields:
+        if field not in shopify_fields:
+            continue
+        # Missing values share the code -1, so they still match each other
+        codes, uniques = pd.factorize(np.concatenate([shopify_fields[field], amazon_fields[field]]))
+        codes = codes.astype(np.int16 if len(uniques) < np.iinfo(np.int16).max else np.int32)
+        shopify_fields[field] = codes[:len(shopify_fields[field])]
+        amazon_fields[field] = codes[len(shopify_fields[field]):]
+    return shopify_fields, amazon_fields
+
+def _unique_strings(values):
+    """Factorize values into codes and unique strings, with missing entries as '', plus a mask of which entries were strings"""
+    valid = np.array([isinstance(value, str) for value in values], dtype=bool)
+    strings = np.where(valid, values, '') if len(values) else np.asarray(values, dtype=object)
+    codes, uniques = pd.factorize(strings)
+    return codes, list(uniques), valid
+
+def _house_number_blocks(s_house_numbers, a_house_numbers):
+    """
+    Return the (shopify, amazon) position pairs whose house numbers pass the fuzz.ratio >= 70 check.
 
-    # Extract fields from rows
-    s_fields = {key: shopify_row.get(key, '') for key in weights.keys()}
-    a_fields = {key: amazon_row.get(key, '') for key in weights.keys()}
+    Records are blocked by house number: the check runs once per pair of distinct house numbers, and only
+    records in compatible blocks are paired up. Missing house numbers never pass.
+    """
+    s_codes, s_uniques, s_valid = _unique_strings(s_house_numbers)
+    a_codes, a_uniques, a_valid = _unique_strings(a_house_numbers)
+    s_codes = np.where(s_valid, s_codes, -1)
+    a_codes = np.where(a_valid, a_codes, -1)
+
+    # Only run fuzz.ratio on house number pairs whose lengths are close enough to ever reach 70
+    s_blocks, a_blocks = np.nonzero(
+        _ratio_upper_bounds(_string_lengths(s_uniques)[:, None], _string_lengths(a_uniques)[None, :]) >= 70
+    )
+    unique_ratios = process.cpdist(
+        [s_uniques[i] for i in s_blocks], [a_uniques[j] for j in a_blocks],
+        scorer=fuzz.ratio, processor=None, dtype=np.uint8, workers=-1, score_cutoff=70
+    )
+    passing = unique_ratios >= 70
+    s_blocks, a_blocks = s_blocks[passing], a_blocks[passing]
+
+    # Lay each side out block by block, then expand every compatible pair of blocks into its record pairs
+    s_order = np.argsort(s_codes, kind='stable')
+    a_order = np.argsort(a_codes, kind='stable')
+    s_starts = np.searchsorted(s_codes[s_order], np.arange(len(s_uniques)))
+    a_starts = np.searchsorted(a_codes[a_order], np.arange(len(a_uniques)))
+    s_sizes = np.bincount(s_codes[s_valid], minlength=len(s_uniques))[s_blocks]
+    a_sizes = np.bincount(a_codes[a_valid], minlength=len(a_uniques))[a_blocks]
+
+    pair_sizes = s_sizes * a_sizes
+    block_pair = np.repeat(np.arange(len(s_blocks)), pair_sizes)
+    offsets = np.arange(pair_sizes.sum()) - np.repeat(np.cumsum(pair_sizes) - pair_sizes, pair_sizes)
+    rows = s_order[s_starts[s_blocks][block_pair] + offsets // a_sizes[block_pair]]
+    cols = a_order[a_starts[a_blocks][block_pair] + offsets % a_sizes[block_pair]]
+    return rows, cols
+
+def _string_lengths(values):
+    """Return the length of each string in values, with -1 for missing entries"""
+    return np.fromiter((len(value) if isinstance(value, str) else -1 for value in values), dtype=np.int64, count=len(values))
+
+def _ratio_upper_bounds(s_lengths, a_lengths):
+    """
+    Upper bound on fuzz.ratio from string lengths alone, scoring 0 wherever either side is missing.
 
-    # Initialize total score
-    total_score = 0
+    The Indel distance is at least the difference of the lengths, so fuzz.ratio can be at most
+    200 * min(len) / (len_s + len_a). Rounded up so it also bounds the integer scores.
+    """
+    total = s_lengths + a_lengths
+    bounds = np.ceil(200 * np.minimum(s_lengths, a_lengths) / np.maximum(total, 1))
+    bounds = np.where(total == 0, 100, bounds)
+    return np.where((s_lengths < 0) | (a_lengths < 0), 0, bounds)
+
+def _paired_scores(s_values, a_values, scorer, dtype):
+    """Element-wise scorer between two equal-length arrays of strings, scoring 0 wherever either side is missing"""
+    s_codes, s_uniques, s_valid = _unique_strings(s_values)
+    a_codes, a_uniques, a_valid = _unique_strings(a_values)
+    # Score each distinct (shopify, amazon) string pair once and broadcast back to the candidates
+    pair_keys, pair_codes = np.unique(s_codes.astype(np.int64) * len(a_uniques) + a_codes, return_inverse=True)
+    unique_scores = process.cpdist(
+        [s_uniques[key // len(a_uniques)] for key in pair_keys],
+        [a_uniques[key % len(a_uniques)] for key in pair_keys],
+        scorer=scorer, processor=None, dtype=dtype, workers=-1
+    )
+    scores = unique_scores[pair_codes]
+    scores[~(s_valid & a_valid)] = 0
+    return scores
+
+def calculate_match_scores(shopify_subset, amazon_subset, weights=default_weights, threshold=None):
+    """
+    Calculate weighted match scores between every Shopify and Amazon address record in two subsets.
+    Assumes zip_code has been pre-filtered and is not included in the scoring.
 
-    # Comparison Logic
+    When a threshold is given, pairs are dropped as soon as their best possible score can no longer
+    exceed it, and score 0 like pairs failing the house number check.
 
-    # Exact match fields (No fuzzy matching needed)
-    exact_match_fields = ['street_type', 'state', 'unit_type']
+    Returns a (len(shopify_subset), len(amazon_subset)) array scaled to 0-100
+    """
+    shopify_fields, amazon_fields = _encode_exact_fields(
+        _field_arrays(shopify_subset, weights), _field_arrays(amazon_subset, weights)
+    )
+    rows, cols, scores = _score_pairs(shopify_fields, amazon_fields, weights, threshold)
+    total_score = np.zeros((len(shopify_subset), len(amazon_subset)))
+    total_score[rows, cols] = scores
+    return total_score
+
+@lru_cache(maxsize=None)
+def _scoring_plan(weight_items, exact_fields, jaro_winkler_fields):
+    """
+    Work out once per set of weights, rather than once per zip bucket, how the fields are scored: the exact fields
+    with their weights, then each fuzzy field heaviest first as (field, weight, scorer, score dtype, score scale)
+    """
+    exact = tuple(field for field, _ in weight_items if field in exact_fields)
+    exact_weights = np.array([weight for field, weight in weight_items if field in exact_fields])
+    fuzzy_items = sorted((item for item in weight_items if item[0] not in exact_fields), key=lambda item: item[1], reverse=True)
+    fuzzy_plan = tuple(
+        (field, weight, JaroWinkler.normalized_similarity, np.float64, 1) if field in jaro_winkler_fields
+        else (field, weight, fuzz.ratio, np.uint8, 100)
+        for field, weight in fuzzy_items
+    )
+    return exact, exact_weights, fuzzy_plan
+
+def _score_pairs(shopify_fields, amazon_fields, weights, threshold=None):
+    """
+    Score pairs of records given as dicts of field arrays, as described in calculate_match_scores.
 
-    for field in weights.keys():
-        weight = weights[field]
+    Returns the (shopify, amazon) positions of the pairs that were scored and their scores. Pairs failing the
+    house number check or pruned against the threshold are left out, so callers treat them as scoring 0
+    """
 
-        # Use exact match where applicable
-        if field in exact_match_fields:
-            score = 1.0 if s_fields[field] == a_fields[field] else 0.0
-        
-        # Use fuzzy match for fields with possible variations
-        else:
-            score = fuzz.ratio(s_fields[field], a_fields[field]) / 100
+    # Penalty: If house numbers mismatch heavily, zero the score. Block on it first so failing pairs are never scored
+    rows, cols = _house_number_blocks(shopify_fields['address_number'], amazon_fields['address_number'])
+
+    exact_fields, exact_weights, fuzzy_plan = _scoring_plan(
+        tuple(weights.items()), tuple(exact_match_fields), tuple(jaro_winkler_fields)
+    )
+
+    # Use exact match where applicable: compare all exact fields of every candidate in one broadcast
+    field_scores = {}
+    partial_score = np.zeros(len(rows))
+    if exact_fields:
+        s_exact = np.stack([shopify_fields[field] for field in exact_fields], axis=1)
+        a_exact = np.stack([amazon_fields[field] for field in exact_fields], axis=1)
+        exact_scores = (s_exact[rows] == a_exact[cols]).astype(float)
+        field_scores = {field: exact_scores[:, i] for i, field in enumerate(exact_fields)}
+        partial_score = exact_scores @ exact_weights
+
+    # Bound what each fuzzy field can still add from the string lengths alone, so pairs whose lengths
+    # are too far apart are pruned without ever running fuzz.ratio. Jaro-Winkler has no length bound
+    remaining_bounds = {}
+    if threshold is not None:
+        for field, weight, scorer, _, _ in fuzzy_plan:
+            s_lengths, a_lengths = _string_lengths(shopify_fields[field])[rows], _string_lengths(amazon_fields[field])[cols]
+            if scorer is fuzz.ratio:
+                bounds = _ratio_upper_bounds(s_lengths, a_lengths)
+            else:
+                bounds = np.where((s_lengths < 0) | (a_lengths < 0), 0, 100)
+            remaining_bounds[field] = weight * bounds / 100
+    remaining_score = sum(remaining_bounds.values(), np.zeros(len(rows)))
+
+    # Use fuzzy match for fields with possible variations, heaviest first,
+    # pruning candidates whose remaining fields can't lift them over the threshold
+    for field, weight, scorer, dtype, scale in fuzzy_plan:
+        if threshold is not None:
+            # Small slack so float summation order can never prune a pair that would pass
+            keep = (partial_score + remaining_score) * 100 >= threshold - 1e-9
+            rows, cols, partial_score, remaining_score = rows[keep], cols[keep], partial_score[keep], remaining_score[keep]
+            field_scores = {name: values[keep] for name, values in field_scores.items()}
+            remaining_bounds = {name: values[keep] for name, values in remaining_bounds.items()}
+            remaining_score -= remaining_bounds.pop(field)
+
+        score = _paired_scores(shopify_fields[field][rows], amazon_fields[field][cols], scorer, dtype) / scale
+        field_scores[field] = score
+        partial_score += weight * score
+
+    # Apply weights in their declared order so scores are summed exactly as before
+    candidate_score = np.zeros(len(rows))
+    for field, weight in weights.items():
+        candidate_score += weight * field_scores[field]
+
+    return rows, cols, np.round(candidate_score * 100, 2)  # Scale to 0-100
 
-        # Apply weight
-        total_score += weight * score
+def calculate_match_score(shopify_row, amazon_row, weights=default_weights):
+    """
+    Calculate a weighted match score between Shopify and Amazon address records.
+    Assumes zip_code has been pre-filtered and is not included in the scoring.
 
-    # Penalty: If house numbers mismatch heavily, zero the score
-    house_num_score = fuzz.ratio(s_fields['house_number'], a_fields['house_number']) / 100
-    if house_num_score < 0.7:
-        return 0
+    Output is scaled to 0-100. Pairs failing the house number check score 0:
 
-    return round(total_score * 100, 2)  # Scale to 0-100
+    >>> shopify_row = {'address_number': '12', 'last_name': 'SMITH'}
+    >>> calculate_match_score(shopify_row, {'address_number': '12', 'last_name': 'SMITH'}) > 0
+    True
+    >>> calculate_match_score(shopify_row, {'address_number': '3456', 'last_name': 'SMITH'})
+    0.0
+    """
+    return float(calculate_match_scores(pd.DataFrame([shopify_row]), pd.DataFrame([amazon_row]), weights)[0, 0])
 
 def stitch_identified_data(shopify, amazon, matches, no_name=False):
     # Take the inputs of full shopify and amazon dfs and leverage the matching columns
@@ -161,27 +441,27 @@ def stitch_identified_data(shopify, amazon, matches, no_name=False):
     shopify_filtered = shopify.drop(columns=columns_to_drop).add_suffix('_shopify')
     amazon_filtered = amazon.drop(columns=columns_to_drop).add_suffix('_amazon')
 
-    # Rename the IDs back to their original names
-    shopify_filtered = shopify_filtered.rename(columns={'shopify_id_shopify': 'shopify_id'})
-    amazon_filtered = amazon_filtered.rename(columns={'amazon_id_amazon': 'amazon_id'})
+    # Rename the IDs back to their original names and index on them, so each join below is a lookup into the index
+    shopify_filtered = shopify_filtered.rename(columns={'shopify_id_shopify': 'shopify_id'}).set_index('shopify_id')
+    amazon_filtered = amazon_filtered.rename(columns={'amazon_id_amazon': 'amazon_id'}).set_index('amazon_id')
 
     # 2. Add suffixes to matchable columns in Shopify and Amazon
-    shopify_addy = shopify[matchable_columns].add_suffix('_addy_token')
+    shopify_addy = shopify[matchable_columns].add_suffix('_addy_token').set_axis(shopify['shopify_id'])
 
 
-    # 3. Merge matches with Shopify
-    merged_df = matches.merge(shopify_filtered,on = 'shopify_id', how='left')
+    # 3. Join matches with Shopify
+    merged_df = matches.join(shopify_filtered, on='shopify_id')
 
-    # 4. Merge the result with Amazon, ensuring suffixes for all columns
-    merged_df = merged_df.merge(amazon_filtered, on='amazon_id', how='left')
+    # 4. Join the result with Amazon, ensuring suffixes for all columns
+    merged_df = merged_df.join(amazon_filtered, on='amazon_id')
 
-    # 5. Merge the address tokens back into the merged dataframe once
-    merged_df = merged_df.merge(shopify_addy, left_on='shopify_id', right_index=True, how='left')
+    # 5. Join the address tokens back into the merged dataframe once, by shopify_id
+    merged_df = merged_df.join(shopify_addy, on='shopify_id')
 
     # 6. Reorder columns to place 'score' at the beginning
     score_col = ['score']
     other_cols = [col for col in merged_df.columns if col != 'score']
-    final_df = merged_df[score_col + other_cols]
+    final_df = merged_df[score_col + other_cols].reset_index(drop=True)
 
     return final_df
 